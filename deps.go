@@ -40,13 +40,11 @@ func (ctx *SyncContext) listMissingLocalDeps() []string {
 func (ctx *SyncContext) listMissingRemoteDeps() []string {
 	missing := []string{}
 	if !ctx.IsLocal() {
-		if !ctx.tryRun("which", "inotifywait") {
-			if !ctx.tryRun("fswatch", "--version") {
-				if ctx.IsDarwin() {
-					missing = append(missing, "fswatch")
-				} else {
-					missing = append(missing, "inotify-tools")
-				}
+		if ctx.WatchType() == "" {
+			if ctx.IsDarwin() {
+				missing = append(missing, "fswatch")
+			} else {
+				missing = append(missing, "inotify-tools")
 			}
 		}
 	}
@@ -161,6 +159,7 @@ func (ctx *SyncContext) MissingDependency(names ...string) (err error) {
 	if retCode == 0 {
 		logger.Printf("@(dim:Successfully installed) %s@(dim:.)\n", depsStrLong)
 		ctx.ResetHasGutInstalled()
+		ctx.watchType = nil
 	} else {
 		logger.Printf("@(error:Installation failed.)\n")
 		Shutdown("", 1)
@@ -299,5 +299,8 @@ func EnsureBuild(local *SyncContext, ctx *SyncContext) (didSomething bool, err e
 		return false, nil
 	}
 	err = BuildGut(local, ctx)
+	if err == nil {
+		ctx.ResetHasGutInstalled()
+	}
 	return true, err
 }
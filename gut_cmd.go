@@ -5,6 +5,9 @@ import (
 	"fmt"
 	"path"
 	"strings"
+	"time"
+
+	"github.com/kballard/go-shellquote"
 )
 
 func (ctx *SyncContext) GutRevParseHead() (commit string, err error) {
@@ -15,6 +18,8 @@ func (ctx *SyncContext) GutRevParseHead() (commit string, err error) {
 	return strings.TrimSpace(stdout), nil
 }
 
+const gutDaemonStartTimeout = 5 * time.Second
+
 // Start a git-daemon on the host, bound to port gutd_bind_port on the *localhost* network interface only.
 // `autossh` will create a tunnel to expose this port as gutd_connect_port on the other host.
 func (ctx *SyncContext) GutDaemon(repoName string, bindPort int) (err error) {
@@ -50,7 +55,15 @@ func (ctx *SyncContext) GutDaemon(repoName string, bindPort int) (err error) {
 	if err != nil {
 		return err
 	}
-	return ctx.SaveDaemonPid("daemon", pid)
+	err = ctx.SaveDaemonPid("daemon", pid)
+	if err != nil {
+		return err
+	}
+	if ctx.IsLocal() {
+		// Don't let anyone push or fetch before gut-daemon is actually accepting connections.
+		return WaitForPortOpen(fmt.Sprintf("localhost:%d", bindPort), gutDaemonStartTimeout)
+	}
+	return nil
 }
 
 func (ctx *SyncContext) GutInit() (err error) {
@@ -66,8 +79,14 @@ func (ctx *SyncContext) GutInit() (err error) {
 	return err
 }
 
+// Point origin at the gut-daemon and set the repo's identity. On remote (non-Windows) contexts the steps are
+// chained into a single shell command so that this costs one round trip rather than six.
 func (ctx *SyncContext) GutSetupOrigin(repoName string, connectPort int) (err error) {
 	originUrl := fmt.Sprintf("gut://localhost:%d/%s/", connectPort, repoName)
+	if !ctx.IsLocal() && !ctx.IsWindows() {
+		_, err = ctx.OutputCwd(ctx.AbsSyncPath(), "sh", "-c", gutSetupOriginScript(ctx.GutExe(), originUrl))
+		return err
+	}
 	out, err := ctx.GutOutput("remote")
 	if err != nil {
 		return err
@@ -96,6 +115,23 @@ func (ctx *SyncContext) GutSetupOrigin(repoName string, connectPort int) (err er
 	return err
 }
 
+// Build the sh script used by GutSetupOrigin on remote contexts; each step runs only if the previous ones succeeded.
+func gutSetupOriginScript(gutExe string, originUrl string) string {
+	gutCmd := func(args ...string) string {
+		return shellquote.Join(append([]string{gutExe}, args...)...)
+	}
+	return strings.Join([]string{
+		// Capture the remote list first, so that a failing `gut remote` stops here rather than being hidden by grep.
+		"remotes=$(" + gutCmd("remote") + ")",
+		`if printf '%s\n' "$remotes" | grep -qx origin; then ` + gutCmd("remote", "set-url", "origin", originUrl) +
+			"; else " + gutCmd("remote", "add", "origin", originUrl) + "; fi",
+		gutCmd("config", "color.ui", "always"),
+		"hostname=$(hostname)",
+		gutCmd("config", "user.name") + ` "$hostname"`,
+		gutCmd("config", "user.email") + ` "gut-sync@$hostname"`,
+	}, " && ")
+}
+
 var NeedsCommitError = errors.New("Needs commit before pull.")
 
 func (ctx *SyncContext) GutMerge(branch string) (err error) {
@@ -38,9 +38,8 @@ type FileEvent struct {
 	filepath string
 }
 
-const shutdownChanLen = 20
-
-var shutdownChan = make(chan bool, shutdownChanLen)
+// Closed (once) by Shutdown, which signals every reader at the same time.
+var shutdownChan = make(chan struct{})
 
 func IsShuttingDown() bool {
 	select {
@@ -52,6 +51,10 @@ func IsShuttingDown() bool {
 }
 
 const commitDebounceDuration = 100 * time.Millisecond
+
+// Bound how long a continuous stream of changes can hold off a flush, and how many paths accumulate before one.
+const commitMaxBatchDuration = 1 * time.Second
+const commitMaxBatchPaths = 1000
 const reconnectMinDelay = 2 * time.Second
 
 func (ctx *SyncContext) StartReverseTunnel(srcAddr string, destAddr string) (reconnectChan chan bool, err error) {
@@ -128,7 +131,6 @@ func (ctx *SyncContext) StartReverseTunnel(srcAddr string, destAddr string) (rec
 
 const reconnectBufferLength = 2
 const eventBufferLength = 100
-const forceFullSyncCheckString = "**force full sync check**"
 
 func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 	status := local.NewLogger("sync")
@@ -152,12 +154,14 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 	if err != nil {
 		status.Bail(err)
 	}
-	// status.Printf("Using ports %v\n", ports)
 	gutdPort := ports[0]
 	gutdAddr := fmt.Sprintf("localhost:%d", gutdPort)
 	repoName := RandSeq(8) + local.getPidfileScope()
 
 	eventChan := make(chan FileEvent, eventBufferLength)
+	// Requests for a full commit & sync check on a context are delivered separately from file events, so
+	// that ordinary events don't each need to be compared against a sentinel path.
+	forceSyncChan := make(chan *SyncContext, eventBufferLength)
 
 	// Start up gut-daemon on the local host, and create a reverse tunnel from each of the remote hosts
 	// back to the local gut-daemon. All hosts can connect to gut-daemon at localhost:<gutdPort>, which
@@ -185,9 +189,11 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 			}
 		})
 	}
-	for _, ctx := range remotes {
-		if !ctx.IsLocal() {
-			goTask(ctx, func(taskCtx *SyncContext) {
+	// Remotes on the same host share one SSH connection, and therefore also one reverse tunnel.
+	for _, group := range GroupBySharedConnection(remotes) {
+		if !group[0].IsLocal() {
+			groupCtxs := group
+			goTask(group[0], func(taskCtx *SyncContext) {
 				reconnectChan, err := taskCtx.StartReverseTunnel(gutdAddr, gutdAddr)
 				if err != nil {
 					status.Bail(err)
@@ -195,7 +201,9 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 				go func() {
 					for {
 						<-reconnectChan
-						eventChan <- FileEvent{taskCtx, forceFullSyncCheckString}
+						for _, ctx := range groupCtxs {
+							forceSyncChan <- ctx
+						}
 					}
 				}()
 			})
@@ -219,14 +227,22 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 		tailHash = localTailHash
 		tailHashFoundOn = local
 	}
+	// Any remote without a gut repo must have an empty sync folder; check all of them in parallel.
+	for _, ctx := range remotes {
+		if ctx.GetTailHash() == "" {
+			goTask(ctx, func(taskCtx *SyncContext) {
+				err := taskCtx.AssertSyncFolderIsEmpty()
+				if err != nil {
+					status.Bail(err)
+				}
+			})
+		}
+	}
+	joinTasks()
 	contextsNeedInit := []*SyncContext{}
 	for _, ctx := range remotes {
 		myTailHash := ctx.GetTailHash()
 		if myTailHash == "" {
-			err = ctx.AssertSyncFolderIsEmpty()
-			if err != nil {
-				status.Bail(err)
-			}
 			contextsNeedInit = append(contextsNeedInit, ctx)
 		} else {
 			if tailHash == "" {
@@ -320,8 +336,8 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 	}
 	joinTasks()
 
-	commitScoped := func(src *SyncContext, changedPaths []string, updateUntracked bool) (changed bool, err error) {
-		prefix := CommonPathPrefix(changedPaths...)
+	// prefix is the common path prefix of all the changed paths on src, as accumulated by the event loop.
+	commitScoped := func(src *SyncContext, prefix string, updateUntracked bool) (changed bool, err error) {
 		if prefix != "" {
 			// git is annoying if you try to git-add git-ignored files (printing a message that is very helpful when there is a human
 			// attached to stdin/stderr), so let's always just target the last *folder* by lopping off everything after the last slash:
@@ -353,35 +369,35 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 	joinTasks()
 
 	var haveChanges bool
+	var batchStartTime time.Time
+	var numChangedPaths int
 	var changedPaths map[*SyncContext]map[string]bool
+	var changedPrefix map[*SyncContext]string
 	var changedIgnore map[*SyncContext]bool
 	var forceSyncCheck bool
 	clearChanges := func() {
 		haveChanges = false
+		numChangedPaths = 0
 		changedPaths = make(map[*SyncContext]map[string]bool)
+		changedPrefix = make(map[*SyncContext]string)
 		changedIgnore = make(map[*SyncContext]bool)
 		forceSyncCheck = false
 	}
 	clearChanges()
-	flushChanges := func() {
+	flushChanges := func(changedPrefix map[*SyncContext]string, changedIgnore map[*SyncContext]bool, forceSyncCheck bool) {
 		// Flush all file changes, in three phases:
 		// - Commit on all nodes that have seen recent changes
 		// - Push and merge all changes to the local master
 		// - Pull changes back out to the remotes.
+		var err error
 
 		// First phase, Commit.
 		// (This is typically just one context, except at startup, when we create a pseudo-change event for each context.)
 		changedCtxChan := make(chan *SyncContext)
-		for ctx, pathMap := range changedPaths {
-			go func(taskCtx *SyncContext, taskPathMap map[string]bool) {
-				paths := []string{}
-				for path := range taskPathMap {
-					paths = append(paths, path)
-				}
+		for ctx, prefix := range changedPrefix {
+			go func(taskCtx *SyncContext, taskPrefix string) {
 				_, changedThisIgnore := changedIgnore[taskCtx]
-				// log.Printf("Starting commitScoped on %s\n", taskCtx.NameAnsi())
-				changed, err := commitScoped(taskCtx, paths, changedThisIgnore)
-				// log.Printf("Finished commitScoped on %s\n", taskCtx.NameAnsi())
+				changed, err := commitScoped(taskCtx, taskPrefix, changedThisIgnore)
 				if err != nil {
 					status.Printf("@(error:Commit failed on) %s@(error:: %v)\n", taskCtx.NameAnsi(), err)
 					changedCtxChan <- nil
@@ -392,35 +408,29 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 						changedCtxChan <- nil
 					}
 				}
-			}(ctx, pathMap)
+			}(ctx, prefix)
 		}
 		changedCtxs := []*SyncContext{}
-		for _ = range changedPaths {
+		for _ = range changedPrefix {
 			ctx := <-changedCtxChan
 			if ctx != nil {
 				changedCtxs = append(changedCtxs, ctx)
 			}
 		}
 		if !forceSyncCheck && len(changedCtxs) == 0 {
-			clearChanges()
 			return
 		}
-		clearChanges()
 
 		// Second phase, Push to local.
 		// XXX if remote has a previous change (i.e. from when it was the local), we don't necessarily pick up that change here.
 		for _, ctx := range changedCtxs {
 			if ctx != local {
-				// log.Printf("Starting GutPush on %s\n", ctx.NameAnsi())
 				err = ctx.GutPush()
-				// log.Printf("Finished GutPush on %s\n", ctx.NameAnsi())
 				if err != nil {
 					status.Printf("@(error:Failed to push changes from) %s @(error:to local: %v)\n", ctx.NameAnsi(), err)
 					continue
 				}
-				// log.Printf("Starting GutMerge on %s\n", ctx.NameAnsi())
 				err = local.GutMerge(ctx.BranchName())
-				// log.Printf("Finished GutMerge on %s\n", ctx.NameAnsi())
 				if err != nil {
 					status.Printf("@(error:Failed to merge) %s @(error:into) master@(error:: %v)\n", ctx.BranchName(), err)
 				}
@@ -447,20 +457,15 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 					done <- nil
 					return
 				}
-				// log.Printf("Starting GutRevParseHead on %s\n", taskCtx.NameAnsi())
 				myCommit, err := taskCtx.GutRevParseHead()
-				// log.Printf("Finished GutRevParseHead on %s\n", taskCtx.NameAnsi())
 				if err != nil {
 					done <- err
 					return
 				}
 				localMasterCommit := <-masterCommitChan
 				if localMasterCommit != "" && myCommit != localMasterCommit {
-					// log.Printf("Starting GutPull on %s\n", taskCtx.NameAnsi())
 					err = taskCtx.GutPull()
-					// log.Printf("Finished GutPull on %s\n", taskCtx.NameAnsi())
 				}
-				// log.Printf("Finished third phase on %s\n", taskCtx.NameAnsi())
 				done <- err
 			}(ctx)
 		}
@@ -470,7 +475,7 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 				if err == NeedsCommitError {
 					status.Printf("@(dim:Need to commit on) %s @(dim:before it can pull.)\n", ctx.NameAnsi())
 					go func() {
-						eventChan <- FileEvent{ctx, forceFullSyncCheckString}
+						forceSyncChan <- ctx
 					}()
 					err = nil
 				}
@@ -488,51 +493,87 @@ func Sync(local *SyncContext, remotes []*SyncContext) (err error) {
 		// the commit_and_update calls below and the time that the filesystem watches are attached.
 		for _, ctx := range allContexts {
 			// Queue up an event to force checking for changes.
-			eventChan <- FileEvent{ctx, forceFullSyncCheckString}
+			forceSyncChan <- ctx
 		}
 	}()
 
 	// Process messages from eventChan forever. Read as many messages as possible before needing to wait at least
-	// commitDebounceDuration, at which point we flush all the events (and commit & sync changes, etc).
+	// commitDebounceDuration, at which point we flush all the events (and commit & sync changes, etc). A batch is
+	// also flushed once it is commitMaxBatchDuration old or has commitMaxBatchPaths paths, so that a steady
+	// stream of changes can't postpone syncing indefinitely.
+	// Flushes run in the background, one at a time, so that this loop keeps draining eventChan (and the
+	// watchers don't block) while a slow commit/push/pull is in flight. Changes that arrive during a flush
+	// are collected into the next batch.
+	// Reuse a single debounce timer rather than allocating a new one via time.After for every event.
+	debounceTimer := time.NewTimer(commitDebounceDuration)
+	StopTimer(debounceTimer)
+	flushing := false
+	flushDone := make(chan bool)
+	startFlush := func() {
+		batchPrefix, batchIgnore, batchForceSyncCheck := changedPrefix, changedIgnore, forceSyncCheck
+		clearChanges()
+		flushing = true
+		go func() {
+			flushChanges(batchPrefix, batchIgnore, batchForceSyncCheck)
+			flushDone <- true
+		}()
+	}
 	var event FileEvent
 	for {
-		if haveChanges {
-			select {
-			case event = <-eventChan:
-				break
-			case <-time.After(commitDebounceDuration):
-				flushChanges()
+		var debounceChan <-chan time.Time
+		if haveChanges && !flushing {
+			wait := commitDebounceDuration
+			untilDeadline := commitMaxBatchDuration - time.Since(batchStartTime)
+			if untilDeadline < wait {
+				wait = untilDeadline
+			}
+			if wait <= 0 || numChangedPaths >= commitMaxBatchPaths {
+				startFlush()
 				continue
 			}
-		} else {
-			event = <-eventChan
+			ResetTimer(debounceTimer, wait)
+			debounceChan = debounceTimer.C
 		}
-		if event.filepath == forceFullSyncCheckString {
+		select {
+		case event = <-eventChan:
+			break
+		case forceCtx := <-forceSyncChan:
 			// Force an attempt to update all the remotes, even if there are no new commits.
 			forceSyncCheck = true
-			// And also force a full commit & update-untracked on this node
-			changedIgnore[event.ctx] = true
-		}
-		parts := strings.Split(event.filepath, "/")
-		skip := false
-		for _, part := range parts {
-			if part == ".gut" {
-				skip = true
-			} else if part == ".gutignore" {
-				changedIgnore[event.ctx] = true
-			}
+			// And also force a full commit & update-untracked on this node (an empty path widens the commit
+			// scope to the whole sync folder).
+			changedIgnore[forceCtx] = true
+			event = FileEvent{forceCtx, ""}
+		case <-debounceChan:
+			startFlush()
+			continue
+		case <-flushDone:
+			flushing = false
+			continue
 		}
-		if skip {
+		if IsGutRepoPath(event.filepath) {
 			continue
 		}
-		// status.Printf("@(dim:[)%s@(dim:] changed on) %s\n", event.filepath, event.ctx.NameAnsi())
-		haveChanges = true
+		if IsGutignorePath(event.filepath) {
+			changedIgnore[event.ctx] = true
+		}
+		if !haveChanges {
+			haveChanges = true
+			batchStartTime = time.Now()
+		}
+		// Narrow the commit scope for this context as each new path arrives, so that a flush doesn't need to
+		// rescan the whole batch.
 		ctxChanged, ok := changedPaths[event.ctx]
 		if !ok {
 			ctxChanged = make(map[string]bool)
 			changedPaths[event.ctx] = ctxChanged
+			changedPrefix[event.ctx] = event.filepath
+		}
+		if !ctxChanged[event.filepath] {
+			ctxChanged[event.filepath] = true
+			changedPrefix[event.ctx] = CommonPathPrefix(changedPrefix[event.ctx], event.filepath)
+			numChangedPaths++
 		}
-		ctxChanged[event.filepath] = true
 	}
 }
 
@@ -540,29 +581,30 @@ var shutdownLock sync.Mutex
 
 func Shutdown(reason string, exitcode int) {
 	shutdownLock.Lock()
-	for i := 0; i < shutdownChanLen; i++ {
-		shutdownChan <- true
-	}
+	close(shutdownChan)
 	status := log.New(os.Stderr, "", 0)
 	if reason != "" {
 		status.Printf("%s ", reason)
 	}
 	status.Printf("Stopping all subprocesses...\n")
 	done := make(chan bool)
-	for _, _ctx := range AllSyncContexts {
-		go func(ctx *SyncContext) {
-			if ctx.IsConnected() {
-				ctx.KillAllSessions()
+	connGroups := GroupBySharedConnection(AllSyncContexts)
+	for _, _group := range connGroups {
+		go func(group []*SyncContext) {
+			if group[0].IsConnected() {
+				group[0].KillAllSessions()
 				// This generally shouldn't *do* anything other than
 				// clean up the PID files, as the killing would have
 				// been done already in KillAllSessions.
-				ctx.KillAllViaPidfiles()
-				ctx.Close()
+				for _, ctx := range group {
+					ctx.KillAllViaPidfiles()
+				}
+				group[0].Close()
 			}
 			done <- true
-		}(_ctx)
+		}(_group)
 	}
-	for range AllSyncContexts {
+	for range connGroups {
 		select {
 		case <-done:
 		case <-time.After(3 * time.Second):
@@ -717,19 +759,27 @@ func main() {
 			if err != nil {
 				status.Bail(err)
 			}
-			go func(_remote *SyncContext) {
-				err = _remote.Connect()
+		}
+		// Connect once per distinct host; remotes on the same host share that connection, and then run their
+		// own setup in parallel over it.
+		for _, remoteGroup := range GroupBySharedConnection(remotes) {
+			go func(group []*SyncContext) {
+				err := group[0].Connect()
 				if err != nil {
-					status.Printf("@(error:Failed to connect to %s: %s)\n", remote.Hostname(), err)
+					status.Printf("@(error:Failed to connect to %s: %s)\n", group[0].Hostname(), err)
 					Shutdown("", 1)
 				}
-				_remote.KillAllViaPidfiles()
-				err = _remote.CheckRemoteDeps()
-				if err != nil {
-					status.Bail(err)
+				for _, _remote := range group {
+					go func(remote *SyncContext) {
+						remote.KillAllViaPidfiles()
+						err := remote.CheckRemoteDeps()
+						if err != nil {
+							status.Bail(err)
+						}
+						ready <- nil
+					}(_remote)
 				}
-				ready <- nil
-			}(remote)
+			}(remoteGroup)
 		}
 
 		for i := 0; i < len(remotes)+1; i++ {
@@ -9,6 +9,7 @@ import (
 	"regexp"
 	"strconv"
 	"strings"
+	"sync"
 
 	"github.com/tillberg/bismuth"
 )
@@ -17,11 +18,18 @@ type SyncContext struct {
 	*bismuth.ExecContext
 	syncPath        string
 	hasGutInstalled *bool
+	watchType       *string
 	tailHash        string
+	watchedRoot     string
+	watchedRootOnce sync.Once
 }
 
 var AllSyncContexts = []*SyncContext{}
 
+// Remote SyncContexts that target the same user@host share one ExecContext, so that every session
+// to that host is multiplexed over a single SSH connection instead of paying for a new handshake.
+var sharedExecContexts = map[string]*bismuth.ExecContext{}
+
 func NewSyncContext() *SyncContext {
 	ctx := &SyncContext{}
 	ctx.ExecContext = bismuth.NewExecContext()
@@ -47,11 +55,34 @@ func (ctx *SyncContext) ParseSyncPath(path string) error {
 			}
 		}
 		ctx.SetHostname(parts[4])
+		connKey := ctx.Username() + "@" + ctx.Hostname()
+		shared, ok := sharedExecContexts[connKey]
+		if ok {
+			ctx.ExecContext = shared
+		} else {
+			sharedExecContexts[connKey] = ctx.ExecContext
+		}
 	}
 	ctx.syncPath = parts[5]
 	return nil
 }
 
+// Group contexts by the ExecContext (and thus the SSH connection) that they share, preserving order.
+func GroupBySharedConnection(ctxs []*SyncContext) [][]*SyncContext {
+	groups := [][]*SyncContext{}
+	groupIndex := map[*bismuth.ExecContext]int{}
+	for _, ctx := range ctxs {
+		i, ok := groupIndex[ctx.ExecContext]
+		if !ok {
+			i = len(groups)
+			groupIndex[ctx.ExecContext] = i
+			groups = append(groups, []*SyncContext{})
+		}
+		groups[i] = append(groups[i], ctx)
+	}
+	return groups
+}
+
 func (ctx *SyncContext) AbsSyncPath() string {
 	return ctx.AbsPath(ctx.syncPath)
 }
@@ -120,6 +151,16 @@ func (ctx *SyncContext) _hasGutInstalled() bool {
 	return false
 }
 
+// The filesystem watcher command (inotifywait or fswatch) available on this context, or "" if there is
+// neither. This is probed once and then reused, as each probe is a round trip on remote contexts.
+func (ctx *SyncContext) WatchType() string {
+	if ctx.watchType == nil {
+		watchType := ctx.GetCmd("inotifywait", "fswatch")
+		ctx.watchType = &watchType
+	}
+	return *ctx.watchType
+}
+
 func (ctx *SyncContext) GetTailHash() string {
 	return ctx.tailHash
 }
@@ -6,6 +6,8 @@ import (
 	"fmt"
 	"io"
 	"math/rand"
+	"net"
+	"os"
 	"path/filepath"
 	"strings"
 	"time"
@@ -16,12 +18,10 @@ import (
 	"github.com/tillberg/watcher"
 )
 
+// TODO: Convert e.g. C:\foo\bar to /C/foo/bar for the msysgit build. An untested strings.Replace
+// version of this used to sit (unreachable) below the panic; see git history if picking this back up.
 func WindowsPathToMingwPath(p string) string {
 	panic("XXX Does this work?")
-	// XXX path/filepath might be better for this sort of thing
-	p = strings.Replace(p, ":", "", 1)
-	p = strings.Replace(p, "\\", "/", -1)
-	return "/" + p
 }
 
 const defaultNumCores = "4"
@@ -48,16 +48,32 @@ func FindOpenPorts(numPorts int, ctxs ...*SyncContext) ([]int, error) {
 	if numPorts == 0 {
 		return []int{}, nil
 	}
-	var netstatsBuf bytes.Buffer
-	for _, ctx := range ctxs {
-		opt := "-anl"
-		if ctx.IsWindows() {
-			opt = "-an"
-		}
-		output, err := ctx.Output("netstat", opt)
-		if err != nil {
-			return nil, err
+	// Query netstat on all contexts in parallel; each one is a separate round trip.
+	outputs := make([]string, len(ctxs))
+	errs := make(chan error, len(ctxs))
+	for i, ctx := range ctxs {
+		go func(i int, ctx *SyncContext) {
+			opt := "-anl"
+			if ctx.IsWindows() {
+				opt = "-an"
+			}
+			output, err := ctx.Output("netstat", opt)
+			outputs[i] = output
+			errs <- err
+		}(i, ctx)
+	}
+	var firstErr error
+	for range ctxs {
+		err := <-errs
+		if err != nil && firstErr == nil {
+			firstErr = err
 		}
+	}
+	if firstErr != nil {
+		return nil, firstErr
+	}
+	var netstatsBuf bytes.Buffer
+	for _, output := range outputs {
 		netstatsBuf.WriteString(output)
 		netstatsBuf.WriteString(" ")
 	}
@@ -79,6 +95,24 @@ func FindOpenPorts(numPorts int, ctxs ...*SyncContext) ([]int, error) {
 	return nil, errors.New("Not enough available ports found")
 }
 
+const portPollInterval = 50 * time.Millisecond
+
+// Poll until something accepts TCP connections at addr, giving up after timeout.
+func WaitForPortOpen(addr string, timeout time.Duration) error {
+	deadline := time.Now().Add(timeout)
+	for {
+		conn, err := net.DialTimeout("tcp", addr, portPollInterval)
+		if err == nil {
+			conn.Close()
+			return nil
+		}
+		if time.Now().After(deadline) {
+			return err
+		}
+		time.Sleep(portPollInterval)
+	}
+}
+
 func (ctx *SyncContext) GetCmd(commands ...string) string {
 	for _, command := range commands {
 		_, _, retCode, err := ctx.Run("which", command)
@@ -89,6 +123,21 @@ func (ctx *SyncContext) GetCmd(commands ...string) string {
 	return ""
 }
 
+// Stop t and drain its channel if it already fired, so that it can be safely Reset.
+func StopTimer(t *time.Timer) {
+	if !t.Stop() {
+		select {
+		case <-t.C:
+		default:
+		}
+	}
+}
+
+func ResetTimer(t *time.Timer, d time.Duration) {
+	StopTimer(t)
+	t.Reset(d)
+}
+
 var letters = []rune("abcdefghijklmnopqrstuvwxyz")
 
 func RandSeq(n int) string {
@@ -164,18 +213,21 @@ func NewLineBuf(lineCallback func([]byte)) *LineBuf {
 	return &LineBuf{lineCallback, []byte{}}
 }
 
+// The resolved sync path is queried once per context; it's needed for every pidfile operation, and
+// each query is a round trip on remote contexts.
 func (ctx *SyncContext) WatchedRoot() string {
-	var watchedRoot string
-	var err error
-	if ctx.IsWindows() {
-		watchedRoot, err = ctx.OutputCwd(ctx.AbsSyncPath(), "cmd", "/c", "cd ,")
-	} else {
-		watchedRoot, err = ctx.OutputCwd(ctx.AbsSyncPath(), "pwd", "-P")
-	}
-	if err != nil {
-		alog.Bail(err)
-	}
-	return watchedRoot
+	ctx.watchedRootOnce.Do(func() {
+		var err error
+		if ctx.IsWindows() {
+			ctx.watchedRoot, err = ctx.OutputCwd(ctx.AbsSyncPath(), "cmd", "/c", "cd ,")
+		} else {
+			ctx.watchedRoot, err = ctx.OutputCwd(ctx.AbsSyncPath(), "pwd", "-P")
+		}
+		if err != nil {
+			alog.Bail(err)
+		}
+	})
+	return ctx.watchedRoot
 }
 
 func (ctx *SyncContext) WatchForChanges(fileEventCallback func(string)) {
@@ -183,7 +235,7 @@ func (ctx *SyncContext) WatchForChanges(fileEventCallback func(string)) {
 		ctx.watchForChangesLocal(fileEventCallback)
 		return
 	}
-	watchType := ctx.GetCmd("inotifywait", "fswatch")
+	watchType := ctx.WatchType()
 	status := ctx.NewLogger(watchType)
 	args := []string{}
 	if watchType == "inotifywait" {
@@ -216,7 +268,6 @@ func (ctx *SyncContext) WatchForChanges(fileEventCallback func(string)) {
 				}
 			}
 			buf := NewLineBuf(func(b []byte) {
-				// status.Printf("Received: %q\n", string(b))
 				p := string(b)
 				if !filepath.IsAbs(p) {
 					p = filepath.Join(watchedRoot, p)
@@ -225,7 +276,6 @@ func (ctx *SyncContext) WatchForChanges(fileEventCallback func(string)) {
 				if err != nil {
 					status.Bail(err)
 				}
-				// status.Printf("relPath: %q from %q\n", relPath, watchedRoot)
 				fileEventCallback(relPath)
 			})
 			chanStdout := make(chan io.Reader)
@@ -322,23 +372,52 @@ func (ctx *SyncContext) AssertSyncFolderIsEmpty() (err error) {
 	if !fileInfo.IsDir() {
 		bail()
 	}
-	out, err := ctx.Output("ls", "-A", ctx.AbsSyncPath())
-	if err != nil {
-		bail()
-	}
-	if len(strings.TrimSpace(out)) > 0 {
+	isEmpty, err := ctx.isEmptyDir(p)
+	if err != nil || !isEmpty {
 		bail()
 	}
 	return nil
 }
 
+// Report whether the folder at p has no entries. This only reads as far as the first entry, rather than
+// listing (and, on remote contexts, transferring) the whole folder.
+func (ctx *SyncContext) isEmptyDir(p string) (bool, error) {
+	if ctx.IsLocal() {
+		dir, err := os.Open(p)
+		if err != nil {
+			return false, err
+		}
+		defer dir.Close()
+		_, err = dir.Readdirnames(1)
+		if err == io.EOF {
+			return true, nil
+		}
+		return false, err
+	}
+	// find stops at the first entry, and (unlike piping ls through head) still fails if p can't be read.
+	out, err := ctx.Output("find", p, "-mindepth", "1", "-maxdepth", "1", "-print", "-quit")
+	if err != nil {
+		return false, err
+	}
+	return strings.TrimSpace(out) == "", nil
+}
+
+// Report whether prefix is p itself or one of its ancestor folders, i.e. whether it ends on a path component
+// boundary within p ("a/bob" is a path prefix of "a/bob/x" but not of "a/bobby").
+func hasPathPrefix(p string, prefix string) bool {
+	if !strings.HasPrefix(p, prefix) {
+		return false
+	}
+	return len(p) == len(prefix) || prefix == "" || prefix[len(prefix)-1] == '/' || p[len(prefix)] == '/'
+}
+
 func CommonPathPrefix(paths ...string) string {
 	if len(paths) == 0 {
 		return ""
 	}
 	common := paths[0]
 	for _, path := range paths[1:] {
-		for len(path) < len(common) || path[:len(common)] != common {
+		for !hasPathPrefix(path, common) {
 			if common[len(common)-1] == '/' {
 				// Lop off the trailing slash, if there is one
 				common = common[:len(common)-1]
@@ -357,6 +436,16 @@ func CommonPathPrefix(paths ...string) string {
 	return common
 }
 
+// Report whether p is, or is inside of, a .gut folder. This runs for every file event, so it uses plain
+// string tests rather than splitting p into its components.
+func IsGutRepoPath(p string) bool {
+	return p == ".gut" || strings.HasPrefix(p, ".gut/") || strings.HasSuffix(p, "/.gut") || strings.Contains(p, "/.gut/")
+}
+
+func IsGutignorePath(p string) bool {
+	return p == ".gutignore" || strings.HasSuffix(p, "/.gutignore")
+}
+
 func JoinWithAndAndCommas(strs ...string) string {
 	if len(strs) == 0 {
 		return ""
@@ -2,7 +2,15 @@ package main
 
 import (
 	"github.com/stretchr/testify/assert"
+	"io/ioutil"
+	"net"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strconv"
+	"strings"
 	"testing"
+	"time"
 )
 
 func TestCommonPathPrefix(t *testing.T) {
@@ -19,4 +27,89 @@ func TestCommonPathPrefix(t *testing.T) {
 	assert.Equal("/", CommonPathPrefix("/say/hello/bob", "/yell/hello/bob"))
 	assert.Equal("", CommonPathPrefix("/say/hello/bob", "./yell/hello/bob"))
 	assert.Equal("/say/", CommonPathPrefix("/say/hello/bob", "/say/hello/sally", "/say/hi/"))
+	assert.Equal("hello/", CommonPathPrefix("hello/bob", "hello/bobby"))
+	assert.Equal("hello/", CommonPathPrefix("hello/bobby", "hello/bob"))
+	assert.Equal("hello/bob", CommonPathPrefix("hello/bob", "hello/bob/sally"))
+	assert.Equal("/say/", CommonPathPrefix(CommonPathPrefix("/say/hello/bob", "/say/hello/sally"), "/say/hi/"))
+}
+
+func TestIsGutRepoPath(t *testing.T) {
+	assert := assert.New(t)
+	assert.True(IsGutRepoPath(".gut"))
+	assert.True(IsGutRepoPath(".gut/index"))
+	assert.True(IsGutRepoPath("sub/.gut"))
+	assert.True(IsGutRepoPath("sub/.gut/objects/ab"))
+	assert.False(IsGutRepoPath(".gutignore"))
+	assert.False(IsGutRepoPath("sub/.gutignore"))
+	assert.False(IsGutRepoPath("my.gut/file"))
+	assert.False(IsGutRepoPath("sub/x.gut"))
+}
+
+func TestIsGutignorePath(t *testing.T) {
+	assert := assert.New(t)
+	assert.True(IsGutignorePath(".gutignore"))
+	assert.True(IsGutignorePath("sub/.gutignore"))
+	assert.False(IsGutignorePath("sub/.gutignore.swp"))
+	assert.False(IsGutignorePath("sub/my.gutignore"))
+}
+
+func TestWaitForPortOpen(t *testing.T) {
+	assert := assert.New(t)
+	listener, err := net.Listen("tcp", "127.0.0.1:0")
+	if err != nil {
+		t.Fatal(err)
+	}
+	addr := listener.Addr().String()
+	assert.NoError(WaitForPortOpen(addr, time.Second))
+	listener.Close()
+	assert.Error(WaitForPortOpen(addr, 100*time.Millisecond))
+}
+
+// Run gutSetupOriginScript against a fake gut executable (in a folder whose name needs quoting) that logs
+// its arguments and answers `gut remote` with existingRemotes and remoteExitCode. Returns the logged commands.
+func runGutSetupOriginScript(t *testing.T, existingRemotes string, remoteExitCode int, originUrl string) ([]string, error) {
+	dir, err := ioutil.TempDir("", "gut setup origin")
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer os.RemoveAll(dir)
+	fakeGut := filepath.Join(dir, "fake gut")
+	fakeGutScript := "#!/bin/sh\n" +
+		"echo \"$*\" >> \"$(dirname \"$0\")/log\"\n" +
+		"if [ \"$*\" = remote ]; then printf '" + existingRemotes + "'; exit " + strconv.Itoa(remoteExitCode) + "; fi\n"
+	err = ioutil.WriteFile(fakeGut, []byte(fakeGutScript), 0755)
+	if err != nil {
+		t.Fatal(err)
+	}
+	scriptErr := exec.Command("sh", "-c", gutSetupOriginScript(fakeGut, originUrl)).Run()
+	log, err := ioutil.ReadFile(filepath.Join(dir, "log"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	return strings.Split(strings.TrimSpace(string(log)), "\n"), scriptErr
+}
+
+func TestGutSetupOriginScript(t *testing.T) {
+	assert := assert.New(t)
+	originUrl := "gut://localhost:34000/abc def/"
+	hostname, err := os.Hostname()
+	if err != nil {
+		t.Fatal(err)
+	}
+	cmds, err := runGutSetupOriginScript(t, "origin-old\\nupstream\\n", 0, originUrl)
+	assert.NoError(err)
+	assert.Equal([]string{
+		"remote",
+		"remote add origin " + originUrl,
+		"config color.ui always",
+		"config user.name " + hostname,
+		"config user.email gut-sync@" + hostname,
+	}, cmds)
+	cmds, err = runGutSetupOriginScript(t, "upstream\\norigin\\n", 0, originUrl)
+	assert.NoError(err)
+	assert.Equal("remote set-url origin "+originUrl, cmds[1])
+	// A failing `gut remote` must stop the script before it touches origin.
+	cmds, err = runGutSetupOriginScript(t, "", 3, originUrl)
+	assert.Error(err)
+	assert.Equal([]string{"remote"}, cmds)
 }